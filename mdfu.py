@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """MDFU protocol"""
+import struct
 from enum import Enum
+from functools import lru_cache
 from packaging.version import Version
 
 class EnumDescription(int, Enum):
@@ -63,6 +65,14 @@ class MdfuCmd(Enum):
     GET_IMAGE_STATE = 4
     END_TRANSFER = 5
 
+# Valid command and status code values, computed once at import time
+_MDFU_CMD_VALUES = frozenset(item.value for item in MdfuCmd)
+_MDFU_STATUS_VALUES = frozenset(item.value for item in MdfuStatus)
+
+# Enum member names by value, avoids the enum value lookup when formatting
+_CMD_NAME = {item.value: item.name for item in MdfuCmd}
+_STATUS_NAME = {item.value: item.name for item in MdfuStatus}
+
 class ClientInfoType(Enum):
     """MDFU data types for GetClientInfo command response"""
     PROTOCOL_VERSION = 1
@@ -70,6 +80,10 @@ class ClientInfoType(Enum):
     COMMAND_TIMEOUTS = 3
     INTER_TRANSACTION_DELAY = 4
 
+# Enum members by value, avoids the EnumMeta call path on decode
+_MDFU_CMD_BY_VALUE = {item.value: item for item in MdfuCmd}
+_CLIENTINFO_TYPE_BY_VALUE = {item.value: item for item in ClientInfoType}
+
 class ImageState(Enum):
     """MDFU firmware image states for GetImageState command response"""
     VALID = 1
@@ -121,10 +135,19 @@ class MdfuStatusInvalidError(MdfuProtocolError):
 class MdfuUpdateError(MdfuProtocolError):
     """MDFU exception for a failed firmware update
     """
+# Precompiled unpacker for the two-byte MDFU packet header
+# (sequence field, command/status code)
+_PKT_HDR = struct.Struct("<BB")
+
+# Precompiled unpackers for little-endian integer fields
+_UINT16_LE = struct.Struct("<H")
+_UINT32_LE = struct.Struct("<I")
+
 # pylint: disable-next=too-few-public-methods
 class MdfuPacket():
     """MDFU packet class
     """
+    __slots__ = ()
 
 class InterTransactionDelay:
     """
@@ -138,6 +161,8 @@ class InterTransactionDelay:
     :cvar MAX_INTER_TRANSACTION_DELAY_SECONDS: The maximum delay allowed in seconds.
     :cvartype MAX_INTER_TRANSACTION_DELAY_SECONDS: float
     """
+    __slots__ = ("value", "_seconds")
+
     MAX_INTER_TRANSACTION_DELAY_SECONDS = 0xffff_ffff * 1e-9
     def __init__(self, value):
         """
@@ -153,6 +178,8 @@ class InterTransactionDelay:
             raise ValueError("Inter transaction delay must be a positive value")
         # store as ns value
         self.value = int(value * 1e9)
+        # The delay is immutable so the seconds representation is computed once
+        self._seconds = round(self.value * 1e-9, 9)
 
     @property
     def seconds(self):
@@ -162,7 +189,7 @@ class InterTransactionDelay:
         :return: The delay value in seconds, rounded to 9 decimal places.
         :rtype: float
         """
-        return round(self.value * 1e-9, 9)
+        return self._seconds
 
     @property
     def ns(self):
@@ -187,7 +214,7 @@ class InterTransactionDelay:
         """
         if len(data) != 4:
             raise ValueError(f"Expected 4 bytes for inter-transaction delay but got {len(data)}")
-        itd_ns = int.from_bytes(data, byteorder="little")
+        itd_ns = _UINT32_LE.unpack(data)[0]
         # Large/small number calculations can lead to a small rounding error. We correct this
         # here by rounding up to nano seconds (e.g. 50 * 1e-6 would lead to 4.9999999999999996e-05).
         # This small error is not relevant so we do the rounding to avoid confusion for the user.
@@ -206,6 +233,8 @@ class InterTransactionDelay:
 class MdfuCmdPacket(MdfuPacket):
     """MDFU command packet
     """
+    __slots__ = ("sync", "command", "data", "sequence_number")
+
     def __init__(self, sequence_number: int, command: int, data: bytes, sync=False):
         """MDFU command packet initialization
 
@@ -222,17 +251,16 @@ class MdfuCmdPacket(MdfuPacket):
         self.sync = sync
         self.command = command
         self.data = data
-        if sequence_number > 31 or sequence_number < 0:
+        if not 0 <= sequence_number <= 31:
             raise ValueError("Valid values for MDFU packet sequence number are 0...31", sequence_number)
         self.sequence_number = sequence_number
-        cmd_values = set(item.value for item in MdfuCmd)
-        if command not in cmd_values:
+        if command not in _MDFU_CMD_VALUES:
             raise MdfuCmdNotSupportedError(f"{hex(command)} is not a valid MDFU command")
 
 
     def __repr__(self) -> str:
         return f"""\
-Command:         {MdfuCmd(self.command).name} ({hex(self.command)})
+Command:         {_CMD_NAME[self.command]} ({hex(self.command)})
 Sequence Number: {self.sequence_number}
 Sync:            {self.sync}
 Data:            {"0x" + self.data.hex() if len(self.data) else ""}
@@ -247,10 +275,11 @@ Data:            {"0x" + self.data.hex() if len(self.data) else ""}
         :return: Fields of the packet (Sequence number, command, data, sync)
         :rtype: Tuple(Int, Int, Bytes, Bool)
         """
-        sequence_field = packet[0]
+        if len(packet) < _PKT_HDR.size:
+            raise MdfuCmdNotSupportedError("MDFU packet too short to contain a command code")
+        sequence_field, command = _PKT_HDR.unpack_from(packet)
         sequence_number = sequence_field & 0x1f
         sync = bool(sequence_field & 0x80)
-        command = int.from_bytes(packet[1:2], byteorder="little")
         data = packet[2:]
         return sequence_number, command, data, sync
 
@@ -273,15 +302,14 @@ Data:            {"0x" + self.data.hex() if len(self.data) else ""}
         :return: MDFU packet in binary form
         :rtype: Bytes
         """
-        sequence_field = self.sequence_number | ((1 << 7) if self.sync else 0x00)
-        packet =  sequence_field.to_bytes(1, byteorder="little") \
-            + self.command.to_bytes(1, byteorder="little") \
-            + self.data
-        return packet
+        sequence_field = self.sequence_number | (self.sync << 7)
+        return bytes((sequence_field, self.command)) + self.data
 
 class MdfuStatusPacket(MdfuPacket):
     """MDFU status packet
     """
+    __slots__ = ("sequence_number", "status", "resend", "data")
+
     def __init__(self, sequence_number, status, data=bytes(), resend=False):
         """MDFU packet initialization
 
@@ -294,12 +322,11 @@ class MdfuStatusPacket(MdfuPacket):
         :param resend: Resend flag for the packet, defaults to False
         :type resend: bool, optional
         """
-        if sequence_number > 31 or sequence_number < 0:
+        if not 0 <= sequence_number <= 31:
             raise ValueError("Valid values for MDFU packet sequence number are 0...31")
         self.sequence_number = sequence_number
 
-        status_values = set(item.value for item in MdfuStatus)
-        if status not in status_values:
+        if status not in _MDFU_STATUS_VALUES:
             raise MdfuStatusInvalidError(f"{hex(status)} is not a valid MDFU status")
         self.status = status
         self.resend = resend
@@ -308,7 +335,7 @@ class MdfuStatusPacket(MdfuPacket):
     def __repr__(self) -> str:
         return f"""\
 Sequence Number: {self.sequence_number}
-Status:          {MdfuStatus(self.status).name} ({hex(self.status)})
+Status:          {_STATUS_NAME[self.status]} ({hex(self.status)})
 Resend:          {self.resend}
 Data:            {"0x" + self.data.hex() if len(self.data) else ""}
 """
@@ -321,10 +348,11 @@ Data:            {"0x" + self.data.hex() if len(self.data) else ""}
         :return: packet sequence number (int), status (int), data (bytes), resend (bool)
         :rtype: tuple(int, int, bytes, bool)
         """
-        sequence_field = packet[0]
+        if len(packet) < _PKT_HDR.size:
+            raise MdfuStatusInvalidError("MDFU packet too short to contain a status code")
+        sequence_field, status = _PKT_HDR.unpack_from(packet)
         sequence_number = sequence_field & 0x1f
         resend = bool(sequence_field & 0x40)
-        status = int.from_bytes(packet[1:2], byteorder="little")
         data = packet[2:]
         return sequence_number, status, data, resend
 
@@ -347,33 +375,32 @@ Data:            {"0x" + self.data.hex() if len(self.data) else ""}
         :return: MDFU packet in binary form
         :rtype: Bytes
         """
-        sequence_field = self.sequence_number | ((1 << 6) if self.resend else 0x00)
-        packet =  sequence_field.to_bytes(1, byteorder="little") \
-            + self.status.to_bytes(1, byteorder="little") \
-            + self.data
-        return packet
+        sequence_field = self.sequence_number | (self.resend << 6)
+        return bytes((sequence_field, self.status)) + self.data
 
 def calculate_checksum(data):
     """Calculate checksum for transport frame
 
     The checksum is a two's complement addition (integer addition)
-    of 16-bit values in little-endian byte oder.
+    of 16-bit values in little-endian byte oder. Data with an odd
+    number of bytes is treated as if it were zero-padded to an even
+    length.
 
     :param data: Input data for checksum calculation
     :type data: Bytes like object
     :return: 16bit checksum
     :rtype: int
     """
-    checksum = 0
-    for i in range(0, len(data), 2):
-        checksum += (data[i + 1] << 8) | data[i]
+    checksum = data[-1] if len(data) % 2 else 0
+    checksum += sum(struct.unpack_from(f"<{len(data) // 2}H", data))
     return (~checksum) & 0xffff
 
 def verify_checksum(data, checksum):
     """Verify transport layer checksum.
 
-    Pads data if needed, calculates checksum and then compares this
-    to the user provided checksum.
+    Calculates the checksum and compares it to the user provided
+    checksum. Odd-length data is handled as zero-padded by
+    calculate_checksum, no padded copy is created here.
 
     :param data: Input data for checksum calculation
     :type data: bytes like object
@@ -382,16 +409,37 @@ def verify_checksum(data, checksum):
     :return: True if checksum is valid and False if not
     :rtype: bool
     """
-    if len(data) % 2:
-        calculated_checksum = calculate_checksum(data + bytes(1))
-    else:
-        calculated_checksum = calculate_checksum(data)
-
-    return checksum == calculated_checksum
+    return checksum == calculate_checksum(data)
+
+@lru_cache(maxsize=64)
+def _parse_version(major, minor, micro, alpha=None):
+    """Create a protocol version from its components, caching the result
+
+    Version construction in packaging runs a regex parse; a capture
+    only ever contains a handful of distinct client versions, so
+    parsed versions are cached keyed on the components.
+
+    :param major: Major version
+    :type major: int
+    :param minor: Minor version
+    :type minor: int
+    :param micro: Micro version
+    :type micro: int
+    :param alpha: Internal alpha version, defaults to None
+    :type alpha: int, optional
+    :return: Protocol version
+    :rtype: Version (from packaging.version)
+    """
+    if alpha is None:
+        return Version(f"{major}.{minor}.{micro}")
+    return Version(f"{major}.{minor}.{micro}-alpha{alpha}")
 
 class ClientInfo():
     """Class to handle MDFU client information
     """
+    __slots__ = ("default_timeout", "timeouts", "protocol_version",
+                 "buffer_size", "buffer_count", "inter_transaction_delay")
+
     PARAM_TYPE_SIZE = 1
     PARAM_LENGTH_SIZE = 1
     BUFFER_INFO_SIZE = 3
@@ -402,6 +450,11 @@ class ClientInfo():
     SECONDS_PER_LSB = 0.1
     LSBS_PER_SECOND = 10
 
+    # Pre-baked (type, length) parameter preambles for encoding
+    _HDR_PROTOCOL_VERSION = bytes((ClientInfoType.PROTOCOL_VERSION.value, PROTOCOL_VERSION_SIZE))
+    _HDR_INTER_TRANSACTION_DELAY = bytes((ClientInfoType.INTER_TRANSACTION_DELAY.value,
+                                          INTER_TRANSACTION_DELAY_SIZE))
+
     #pylint: disable=too-many-positional-arguments
     def __init__(self, version: Version, buffer_count: int, buffer_size: int,
                     default_timeout: float, timeouts: dict = None, inter_transaction_delay = None):
@@ -475,34 +528,28 @@ Command timeouts
         :return: Bytes containing encoded client info
         :rtype: Bytes like object
         """
-        data = ClientInfoType.BUFFER_INFO.value.to_bytes(self.PARAM_TYPE_SIZE, byteorder="little")
-        data += self.BUFFER_INFO_SIZE.to_bytes(self.PARAM_LENGTH_SIZE, byteorder="little")
-        data += self.buffer_size.to_bytes(2, byteorder="little")
-        data += bytes([self.buffer_count])
+        parts = [struct.pack("<BBHB", ClientInfoType.BUFFER_INFO.value,
+                             self.BUFFER_INFO_SIZE, self.buffer_size, self.buffer_count)]
 
-        data += bytes([ClientInfoType.PROTOCOL_VERSION.value])
-        data += self.PROTOCOL_VERSION_SIZE.to_bytes(self.PARAM_LENGTH_SIZE, byteorder="little")
-        data += bytes([self.protocol_version.major, self.protocol_version.minor, self.protocol_version.micro])
+        parts.append(self._HDR_PROTOCOL_VERSION + bytes((self.protocol_version.major,
+                                                         self.protocol_version.minor,
+                                                         self.protocol_version.micro)))
 
-        data += bytes([ClientInfoType.COMMAND_TIMEOUTS.value])
         # Total number of timeouts is: default timeout + timeouts specified in timeouts dict
         timeouts_count = 1 + len(self.timeouts)
         timeouts_size = timeouts_count * self.COMMAND_TIMEOUT_SIZE
-        data += timeouts_size.to_bytes(self.PARAM_LENGTH_SIZE, "little")
-        # Default timeout
-        data += bytes([0])
-        data += int(self.default_timeout * self.LSBS_PER_SECOND).to_bytes(2, "little")
+        # Default timeout (command code 0)
+        parts.append(struct.pack("<BBBH", ClientInfoType.COMMAND_TIMEOUTS.value, timeouts_size,
+                                 0, int(self.default_timeout * self.LSBS_PER_SECOND)))
         # Other command timeouts
         for cmd, value in self.timeouts.items():
-            data += bytes([cmd.value])
-            data += int(value * self.LSBS_PER_SECOND).to_bytes(2, byteorder="little")
+            parts.append(struct.pack("<BH", cmd.value, int(value * self.LSBS_PER_SECOND)))
 
         if self.inter_transaction_delay is not None:
             itd = InterTransactionDelay(self.inter_transaction_delay)
-            data += bytes([ClientInfoType.INTER_TRANSACTION_DELAY.value])
-            data += self.INTER_TRANSACTION_DELAY_SIZE.to_bytes(self.PARAM_LENGTH_SIZE, byteorder="little")
-            data += itd.to_bytes()
-        return data
+            parts.append(self._HDR_INTER_TRANSACTION_DELAY)
+            parts.append(itd.to_bytes())
+        return b"".join(parts)
 
     @classmethod
     def _decode_buffer_info(cls, length, data):
@@ -519,7 +566,7 @@ Command timeouts
         if length != cls.BUFFER_INFO_SIZE:
             raise ValueError("Invalid parameter length for MDFU client buffer info." + \
                              f"Expected {cls.BUFFER_INFO_SIZE} but got {length}")
-        buffer_size = int.from_bytes(data[0:2], byteorder="little")
+        buffer_size = _UINT16_LE.unpack_from(data)[0]
         buffer_count = data[2]
         return buffer_count, buffer_size
 
@@ -536,9 +583,9 @@ Command timeouts
         :rtype: Version (from packaging.version)
         """
         if length == cls.PROTOCOL_VERSION_SIZE:
-            version = Version(f"{data[0]}.{data[1]}.{data[2]}")
+            version = _parse_version(data[0], data[1], data[2])
         elif length == cls.PROTOCOL_VERSION_INTERNAL_SIZE:
-            version = Version(f"{data[0]}.{data[1]}.{data[2]}-alpha{data[3]}")
+            version = _parse_version(data[0], data[1], data[2], data[3])
         else:
             raise ValueError("Invalid parameter length for MDFU client protocol version" + \
                              f"Expected a size of {cls.PROTOCOL_VERSION_SIZE} or " + \
@@ -563,17 +610,18 @@ Command timeouts
         if length % cls.COMMAND_TIMEOUT_SIZE:
             raise ValueError("Invalid parameter length for MDFU client command timeouts" + \
                              f"Expected length to be a multiple of {cls.COMMAND_TIMEOUT_SIZE} but got {length}")
-        cmd_values = set(item.value for item in MdfuCmd)
-        for _ in range(0, length // cls.COMMAND_TIMEOUT_SIZE):
-            if data[0] == 0: #default timeout
-                default_timeout = float(int.from_bytes(data[1:3], byteorder="little")) * cls.SECONDS_PER_LSB
-            elif data[0] not in cmd_values:
-                raise ValueError(f"Invalid command code {data[0]} in MDFU client command timeouts")
+        if length > len(data):
+            raise ValueError("Truncated MDFU client command timeouts parameter. " + \
+                             f"Expected {length} bytes but got {len(data)}")
+        for offset in range(0, length, cls.COMMAND_TIMEOUT_SIZE):
+            cmd_value = data[offset]
+            if cmd_value == 0: #default timeout
+                default_timeout = float(_UINT16_LE.unpack_from(data, offset + 1)[0]) * cls.SECONDS_PER_LSB
+            elif cmd_value not in _MDFU_CMD_VALUES:
+                raise ValueError(f"Invalid command code {cmd_value} in MDFU client command timeouts")
             else:
-                timeout = float(int.from_bytes(data[1:3], byteorder="little")) * cls.SECONDS_PER_LSB
-                cmd = MdfuCmd(data[0])
-                cmd_timeouts[cmd] = timeout
-            data = data[3:]
+                timeout = float(_UINT16_LE.unpack_from(data, offset + 1)[0]) * cls.SECONDS_PER_LSB
+                cmd_timeouts[_MDFU_CMD_BY_VALUE[cmd_value]] = timeout
         if default_timeout is None:
             raise ValueError("No required default timeout is present in client info")
         return default_timeout, cmd_timeouts
@@ -597,10 +645,9 @@ Command timeouts
         inter_transaction_delay = None
         while i < len(data):
             try:
-                try:
-                    parameter_type = ClientInfoType(data[i])
-                except ValueError as err:
-                    raise MdfuClientInfoError(f"Invalid client info parameter type {data[i]}") from err
+                parameter_type = _CLIENTINFO_TYPE_BY_VALUE.get(data[i])
+                if parameter_type is None:
+                    raise MdfuClientInfoError(f"Invalid client info parameter type {data[i]}")
                 parameter_length = data[i+1]
                 parameter_value = data[i + 2:i + 2 + parameter_length]
 
@@ -615,7 +662,7 @@ Command timeouts
 
                 elif parameter_type == ClientInfoType.INTER_TRANSACTION_DELAY:
                     inter_transaction_delay = InterTransactionDelay.from_bytes(parameter_value).seconds
-            except IndexError as err:
+            except (IndexError, struct.error) as err:
                 raise MdfuClientInfoError("Not enough data to decode client information") from err
             except ValueError as err:
                 raise MdfuClientInfoError(f"Error while decoding client information. {err}") from err
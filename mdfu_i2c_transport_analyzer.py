@@ -14,7 +14,9 @@
 """
 Saleae high level analyzer for MDFU SPI transport
 """
+import struct
 from enum import Enum
+from functools import lru_cache
 from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame, ChoicesSetting #pylint: disable=import-error
 from mdfu import MdfuCmdPacket, MdfuStatusPacket, MdfuProtocolError, \
                 verify_checksum, ClientInfo, MdfuCmd, MdfuClientInfoError, \
@@ -25,10 +27,90 @@ class FrameType(Enum):
     RESPONSE_LENGTH = ord('L')
     RESPONSE = ord('R')
 
+# Frame type codes as plain ints to avoid enum value lookups per transaction
+_RSP_LENGTH_TYPE = FrameType.RESPONSE_LENGTH.value
+_RSP_TYPE = FrameType.RESPONSE.value
+
+# Transport frame labels shared across decoders
+_LBL_CRC_VALID = "CRC (Valid)"
+_LBL_CRC_INVALID = "CRC (Invalid)"
+
+# Prebuilt AnalyzerFrame data dicts for the fixed CRC labels.
+# Saleae only reads frame data, so sharing one dict per label is safe.
+_CRC_OK_DATA = {'type': _LBL_CRC_VALID}
+_CRC_BAD_DATA = {'type': _LBL_CRC_INVALID}
+
 class DecodingError(Exception):
     """Exception for errors during protocol decoding
     """
 
+_U16LE = struct.Struct("<H")
+
+def _transport_frame(start_time, end_time, label):
+    """Create a transport layer analyzer frame
+
+    :param start_time: Frame start time
+    :type start_time: datetime
+    :param end_time: Frame end time
+    :type end_time: datetime
+    :param label: Text to display for the frame
+    :type label: str
+    :return: Saleae analyzer frame
+    :rtype: AnalyzerFrame
+    """
+    return AnalyzerFrame('mdfu_transport', start_time, end_time, {'type': label})
+
+def _error_frame(start_time, end_time, error):
+    """Create an error analyzer frame
+
+    :param start_time: Frame start time
+    :type start_time: datetime
+    :param end_time: Frame end time
+    :type end_time: datetime
+    :param error: Error text to display for the frame
+    :type error: str
+    :return: Saleae analyzer frame
+    :rtype: AnalyzerFrame
+    """
+    return AnalyzerFrame('mdfu_error', start_time, end_time, {'error': error})
+
+def _u16le(data, index):
+    """Read a 16-bit little-endian value from a buffer
+
+    :param data: Buffer to read from
+    :type data: bytes, bytearray
+    :param index: Offset of the least significant byte
+    :type index: int
+    :return: 16-bit value
+    :rtype: int
+    """
+    return _U16LE.unpack_from(data, index)[0]
+
+@lru_cache(maxsize=256)
+def _parse_status_packet(packet_bin):
+    """Parse an MDFU status packet from its binary form, caching the result
+
+    Polling sequences repeat identical response packets many times, so
+    parsed packets are cached keyed on the packet bytes.
+
+    :param packet_bin: MDFU status packet in binary form
+    :type packet_bin: bytes
+    :return: Status packet object
+    :rtype: MdfuStatusPacket
+    """
+    return MdfuStatusPacket.from_binary(packet_bin)
+
+@lru_cache(maxsize=256)
+def _parse_cmd_packet(packet_bin):
+    """Parse an MDFU command packet from its binary form, caching the result
+
+    :param packet_bin: MDFU command packet in binary form
+    :type packet_bin: bytes
+    :return: Command packet object
+    :rtype: MdfuCmdPacket
+    """
+    return MdfuCmdPacket.from_binary(packet_bin)
+
 class ResponseDecoder(): #pylint: disable=too-few-public-methods
     """MDFU I2C transport response decoder"""
     RSP_FRAME_TYPE_START = 0
@@ -39,13 +121,15 @@ class ResponseDecoder(): #pylint: disable=too-few-public-methods
     # 1 byte frame type, 2 bytes CRC, at least 2 bytes of payload
     MINIMUM_RESPONSE_FRAME_LENGTH = 5
 
-    def decode(self, data, time, command=None, debug=False):
+    def decode(self, data, time_start, time_end, command=None, debug=False):
         """Decode MDFU I2C transport response
 
         :param data: I2C read transaction data
         :type data: bytearray
-        :param time: Timestamps for I2C data bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for I2C data bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for I2C data bytes
+        :type time_end: list[datetime]
         :param command: Last command sent, used to decode response data, defaults to None
         :type command: int, optional
         :param debug: Enable debug output to Saleae terminal, defaults to False
@@ -58,27 +142,24 @@ class ResponseDecoder(): #pylint: disable=too-few-public-methods
 
         # Verify that response length is reasonable
         if len(data) < self.MINIMUM_RESPONSE_FRAME_LENGTH:
-            transport_frames.append(AnalyzerFrame('mdfu_error',
-                                            time[self.RSP_FRAME_TYPE_START]["start"],
-                                            time[-1]["end"],
-                                            {'error': 'Error Decoding Response (Invalid Length)'}))
+            transport_frames.append(_error_frame(time_start[self.RSP_FRAME_TYPE_START],
+                                            time_end[-1],
+                                            'Error Decoding Response (Invalid Length)'))
             return transport_frames, None
 
-        label_text = "Frame Type Response (R)"
-        transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                            time[self.RSP_FRAME_TYPE_START]["start"],
-                                            time[self.RSP_FRAME_TYPE_START]["end"],
-                                            {'type': label_text}))
+        transport_frames.append(_transport_frame(time_start[self.RSP_FRAME_TYPE_START],
+                                            time_end[self.RSP_FRAME_TYPE_START],
+                                            "Frame Type Response (R)"))
         # Transport payload = MDFU response packet
         mdfu_packet_bin = data[self.RSP_FRAME_RSP_DATA_START:self.RSP_FRAME_RSP_DATA_END + 1]
 
-        if verify_checksum(mdfu_packet_bin, int.from_bytes(data[self.RSP_FRAME_CRC_START:], byteorder="little")):
+        if verify_checksum(mdfu_packet_bin, _u16le(data, len(data) - 2)):
             # Decode MDFU response packet from transport payload
             try:
-                mdfu_packet = MdfuStatusPacket.from_binary(mdfu_packet_bin)
+                mdfu_packet = _parse_status_packet(bytes(mdfu_packet_bin))
                 mdfu_frames.append(AnalyzerFrame('mdfu_prot_response',
-                    time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                    time[self.RSP_FRAME_RSP_DATA_END]["end"],
+                    time_start[self.RSP_FRAME_RSP_DATA_START],
+                    time_end[self.RSP_FRAME_RSP_DATA_END],
                     {'sequence_number': str(mdfu_packet.sequence_number),
                         'resend': mdfu_packet.resend,
                         'status': MdfuStatus(mdfu_packet.status).name,
@@ -94,42 +175,34 @@ class ResponseDecoder(): #pylint: disable=too-few-public-methods
                     if debug:
                         print(exc)
             except MdfuProtocolError as exc:
-                mdfu_frames.append(AnalyzerFrame('mdfu_error',
-                    time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                    time[self.RSP_FRAME_RSP_DATA_END]["end"],
-                    {'error': str(exc)}
-                ))
+                mdfu_frames.append(_error_frame(time_start[self.RSP_FRAME_RSP_DATA_START],
+                    time_end[self.RSP_FRAME_RSP_DATA_END],
+                    str(exc)))
 
             # I2C transport payload frame
-            transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                    time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                                    time[self.RSP_FRAME_RSP_DATA_END]["end"],
-                                    {'type': 'Payload'}))
+            transport_frames.append(_transport_frame(time_start[self.RSP_FRAME_RSP_DATA_START],
+                                    time_end[self.RSP_FRAME_RSP_DATA_END],
+                                    'Payload'))
 
             # I2C transport CRC frame
-            label_text = "CRC (Valid)"
             transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                                time[self.RSP_FRAME_CRC_START]["start"],
-                                                time[self.RSP_FRAME_CRC_END]["end"],
-                                                {'type': label_text}))
+                                                time_start[self.RSP_FRAME_CRC_START],
+                                                time_end[self.RSP_FRAME_CRC_END],
+                                                _CRC_OK_DATA))
         else:
             # I2C transport payload frame
-            transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                    time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                                    time[self.RSP_FRAME_RSP_DATA_END]["end"],
-                                    {'type': 'Payload'}))
+            transport_frames.append(_transport_frame(time_start[self.RSP_FRAME_RSP_DATA_START],
+                                    time_end[self.RSP_FRAME_RSP_DATA_END],
+                                    'Payload'))
 
             # MDFU protocol frame
-            mdfu_frames.append(AnalyzerFrame('mdfu_error',
-                                    time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                                    time[self.RSP_FRAME_RSP_DATA_END]["end"],
-                                    {'error': "Transport error (invalid CRC)"}))
-            label_text = "CRC (Invalid)"
+            mdfu_frames.append(_error_frame(time_start[self.RSP_FRAME_RSP_DATA_START],
+                                    time_end[self.RSP_FRAME_RSP_DATA_END],
+                                    "Transport error (invalid CRC)"))
             # I2C transport CRC frame
-            transport_frames.append(AnalyzerFrame('mdfu_error',
-                                                time[self.RSP_FRAME_CRC_START]["start"],
-                                                time[self.RSP_FRAME_CRC_END]["end"],
-                                                {'error': label_text}))
+            transport_frames.append(_error_frame(time_start[self.RSP_FRAME_CRC_START],
+                                                time_end[self.RSP_FRAME_CRC_END],
+                                                _LBL_CRC_INVALID))
 
         return transport_frames, mdfu_frames
 
@@ -141,57 +214,56 @@ class ResponseLengthDecoder(): #pylint: disable=too-few-public-methods
     RSP_FRAME_CRC_START = -2
     RSP_FRAME_CRC_END = -1
     RSP_FRAME_TYPE_LENGTH = ord("L")
+    # 1 byte frame type, 2 bytes response length, 2 bytes CRC
+    MINIMUM_FRAME_LENGTH = 5
 
-    def decode(self, data, time):
+    def decode(self, data, time_start, time_end):
         """Decode I2C transaction data
 
         :param data: I2C data
         :type data: bytes, bytearray
-        :param time: Timestamps for I2C data
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for I2C data
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for I2C data
+        :type time_end: list[datetime]
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
-        return_frames = []
+        # Verify that frame length is reasonable before touching the CRC,
+        # Saleae can feed truncated transactions around capture start/stop
+        if len(data) < self.MINIMUM_FRAME_LENGTH:
+            return [_error_frame(time_start[self.RSP_FRAME_TYPE_START],
+                                 time_end[-1],
+                                 'Error Decoding Response Length (Invalid Length)')]
         # If we have a valid response type we have a valid response length
         if self.RSP_FRAME_TYPE_LENGTH == data[0]:
             rsp_length_bin = data[self.RSP_FRAME_RSP_LENGTH_START:self.RSP_FRAME_RSP_LENGTH_END + 1]
-            rsp_length = int.from_bytes(rsp_length_bin, byteorder="little")
-            crc_valid = verify_checksum(rsp_length_bin,
-                                        int.from_bytes(data[self.RSP_FRAME_CRC_START:], byteorder="little"))
-
-            label_text = "Response Length (L)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                                time[self.RSP_FRAME_TYPE_START]["start"],
-                                                time[self.RSP_FRAME_TYPE_START]["end"],
-                                                {'type': label_text}))
+            rsp_length = _u16le(data, self.RSP_FRAME_RSP_LENGTH_START)
+            crc_valid = verify_checksum(rsp_length_bin, _u16le(data, len(data) - 2))
+
+            type_frame = _transport_frame(time_start[self.RSP_FRAME_TYPE_START],
+                                          time_end[self.RSP_FRAME_TYPE_START],
+                                          "Response Length (L)")
             if crc_valid:
-                label_response_length_text = f"Response Length: ({rsp_length} bytes)"
-                return_frames.append(AnalyzerFrame('mdfu_transport',
-                        time[self.RSP_FRAME_RSP_LENGTH_START]["start"],
-                        time[self.RSP_FRAME_RSP_LENGTH_END]["end"],
-                        {'type': label_response_length_text}))
-                return_frames.append(AnalyzerFrame('mdfu_transport',
-                        time[self.RSP_FRAME_CRC_START]["start"],
-                        time[self.RSP_FRAME_CRC_END]["end"],
-                        {'type': 'CRC (Valid)'}))
-            else:
-                label_response_length_text = "Response Length (Invalid due to CRC error)"
-                return_frames.append(AnalyzerFrame('mdfu_transport',
-                        time[self.RSP_FRAME_RSP_LENGTH_START]["start"],
-                        time[self.RSP_FRAME_RSP_LENGTH_END]["end"],
-                        {'type': label_response_length_text}))
-                return_frames.append(AnalyzerFrame('mdfu_error',
-                        time[self.RSP_FRAME_CRC_START]["start"],
-                        time[self.RSP_FRAME_CRC_END]["end"],
-                        {'type': 'CRC (Invalid)'}))
-        else:
-            label_text = "Response not ready"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                                time[self.RSP_FRAME_RSP_LENGTH_START]["start"],
-                                                time[self.RSP_FRAME_CRC_END]["end"],
-                                                {'type': label_text}))
-        return return_frames
+                return [type_frame,
+                        _transport_frame(time_start[self.RSP_FRAME_RSP_LENGTH_START],
+                                time_end[self.RSP_FRAME_RSP_LENGTH_END],
+                                f"Response Length: ({rsp_length} bytes)"),
+                        AnalyzerFrame('mdfu_transport',
+                                time_start[self.RSP_FRAME_CRC_START],
+                                time_end[self.RSP_FRAME_CRC_END],
+                                _CRC_OK_DATA)]
+            return [type_frame,
+                    _transport_frame(time_start[self.RSP_FRAME_RSP_LENGTH_START],
+                            time_end[self.RSP_FRAME_RSP_LENGTH_END],
+                            "Response Length (Invalid due to CRC error)"),
+                    AnalyzerFrame('mdfu_error',
+                            time_start[self.RSP_FRAME_CRC_START],
+                            time_end[self.RSP_FRAME_CRC_END],
+                            _CRC_BAD_DATA)]
+        return [_transport_frame(time_start[self.RSP_FRAME_RSP_LENGTH_START],
+                                 time_end[self.RSP_FRAME_CRC_END],
+                                 "Response not ready")]
 
 class CmdDecoder(): #pylint: disable=too-few-public-methods
     """MDFU I2C transport command decoder
@@ -203,32 +275,40 @@ class CmdDecoder(): #pylint: disable=too-few-public-methods
     def __init__(self):
         self.command = None
 
-    def decode(self, data, time):
+    def decode(self, data, time_start, time_end):
         """Decode MDFU command I2C transport frame
 
         :param data: I2C data
         :type data: bytes, bytearray
-        :param time: Timestamps for I2C bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for I2C bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for I2C bytes
+        :type time_end: list[datetime]
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         transport_frames = []
         mdfu_frames = []
+        # Verify that frame length is reasonable before touching the CRC,
+        # Saleae can feed truncated transactions around capture start/stop
+        if len(data) <= self.FRAME_CRC_LEN:
+            error_frame = _error_frame(time_start[0],
+                                       time_end[-1],
+                                       'Error Decoding Command (Invalid Length)')
+            return [error_frame], [error_frame]
         data_size = len(data) - self.FRAME_CRC_LEN
         mdfu_packet_bin = data[:self.FRAME_CRC_START]
 
-        crc_valid = verify_checksum(mdfu_packet_bin, int.from_bytes(data[self.FRAME_CRC_START:], byteorder="little"))
+        crc_valid = verify_checksum(mdfu_packet_bin, _u16le(data, len(data) - 2))
 
         if crc_valid:
             try:
-                mdfu_packet = MdfuCmdPacket.from_binary(mdfu_packet_bin)
+                mdfu_packet = _parse_cmd_packet(bytes(mdfu_packet_bin))
                 self.command = mdfu_packet.command
-                label_text = f"{mdfu_packet}"
                 # MDFU protocol layer frame
                 mdfu_frames.append(AnalyzerFrame('mdfu_prot_command',
-                                    time[0]["start"],
-                                    time[-3]["end"],
+                                    time_start[0],
+                                    time_end[-3],
                                     {
                                         'command': MdfuCmd(mdfu_packet.command).name,
                                         'sequence_number': str(mdfu_packet.sequence_number),
@@ -240,43 +320,38 @@ class CmdDecoder(): #pylint: disable=too-few-public-methods
             except (MdfuProtocolError, ValueError) as exc:
                 self.command = None
                 # MDFU protocol layer frame
-                mdfu_frames.append(AnalyzerFrame('mdfu_error',
-                                        time[0]["start"],
-                                        time[-3]["end"],
-                                        {'error': "MDFU Packet Decoding Error: - " + str(exc)}))
+                mdfu_frames.append(_error_frame(time_start[0],
+                                        time_end[-3],
+                                        f"MDFU Packet Decoding Error: - {exc}"))
             # I2C transport payload frame
             transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                            time[0]["start"],
-                                            time[-3]["end"],
+                                            time_start[0],
+                                            time_end[-3],
                                             {
                                                 'type': "PAYLOAD",
                                                 'data': mdfu_packet_bin
                                                 }
                                             ))
             # I2C transport CRC frame
-            label_text = "CRC (Valid)"
             transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                    time[self.FRAME_CRC_START]["start"],
-                                    time[self.FRAME_CRC_END]["end"],
-                                    {'type': label_text}))
+                                    time_start[self.FRAME_CRC_START],
+                                    time_end[self.FRAME_CRC_END],
+                                    _CRC_OK_DATA))
         else:
             # I2C transport invalid payload frame
             label_text = "Invalid MDFU packet due to CRC error on transport"
-            transport_frames.append(AnalyzerFrame('mdfu_error',
-                                time[0]["start"],
-                                time[-3]["end"],
-                                {'error': label_text}))
+            transport_frames.append(_error_frame(time_start[0],
+                                time_end[-3],
+                                label_text))
             # MDFU protocol layer invalid frame
-            mdfu_frames.append(AnalyzerFrame('mdfu_error',
-                                time[0]["start"],
-                                time[-1]["end"],
-                                {'error': label_text}))
+            mdfu_frames.append(_error_frame(time_start[0],
+                                time_end[-1],
+                                label_text))
             # I2C transport invalid CRC frame
-            label_text = "CRC (Invalid)"
             transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                            time[self.FRAME_CRC_START]["start"],
-                                            time[self.FRAME_CRC_END]["end"],
-                                            {'type': label_text}))
+                                            time_start[self.FRAME_CRC_START],
+                                            time_end[self.FRAME_CRC_END],
+                                            _CRC_BAD_DATA))
 
         return transport_frames, mdfu_frames
 
@@ -323,7 +398,8 @@ class MdfuI2cTransportAnalyzer(HighLevelAnalyzer): #pylint: disable=too-many-ins
         self.response_length_decoder = ResponseLengthDecoder()
         self.command_decoder = CmdDecoder()
         self.buf = bytearray()
-        self.time = []
+        self.time_start = []
+        self.time_end = []
         self.read = False
         self.address_ack = False
         self.address_start = None
@@ -331,14 +407,22 @@ class MdfuI2cTransportAnalyzer(HighLevelAnalyzer): #pylint: disable=too-many-ins
         self.address = None
         self.state = "command"
         self.debug = bool(self.debug_setting == "On")
-        self.protocol_layer = "mdfu" if (self.protocol_layer_setting == 'MDFU Protocol Layer') else "transport"
+        self.mdfu_layer = self.protocol_layer_setting == 'MDFU Protocol Layer'
+        # Dispatch table for I2C frame types, avoids chained string comparisons in decode
+        self.frame_handlers = {
+            "stop": self._on_stop,
+            "address": self._on_address,
+            "start": self._on_start,
+            "data": self.store_data
+        }
 
     def reset_buffers(self):
         """Reset buffers
         This should be done for each I2C transaction
         """
         self.buf.clear()
-        self.time = []
+        self.time_start.clear()
+        self.time_end.clear()
 
     def store_data(self, frame: AnalyzerFrame):
         """Store I2C data in buffer
@@ -348,77 +432,100 @@ class MdfuI2cTransportAnalyzer(HighLevelAnalyzer): #pylint: disable=too-many-ins
         :param frame: Saleae frame that has result type (frame.type="data")
         :type frame: AnalyzerFrame
         """
-        self.time.append({"start": frame.start_time, "end": frame.end_time})
+        self.time_start.append(frame.start_time)
+        self.time_end.append(frame.end_time)
         self.buf.extend(frame.data["data"])
 
     def create_client_frame(self):
         """Create a frame for the I2C client address"""
         label_text = f"Client (0x{self.address:02x}) - {self.state}"
-        return AnalyzerFrame('mdfu_transport',
-                                        self.address_start,
-                                        self.address_end,
-                                        {'type': label_text})
+        return _transport_frame(self.address_start, self.address_end, label_text)
 
     def decode(self, frame: AnalyzerFrame):
         """Decode I2C traffic"""
+        handler = self.frame_handlers.get(frame.type)
+        if handler is None:
+            return None
+        return handler(frame)
+
+    def _on_stop(self, frame: AnalyzerFrame): #pylint: disable=unused-argument
+        """Decode buffered I2C transaction on stop condition
 
-        if "stop" == frame.type:
-            transport_frames = []
-            mdfu_frames = []
-            if not self.address_ack:
-                if self.protocol_layer == "mdfu":
-                    return None
-                return AnalyzerFrame('mdfu_transport',
-                                        self.address_start,
-                                        self.address_end,
-                                        {'type': "Client busy"})
-            # Check if its an I2C read or a write operation
-            if self.read:
-                if FrameType.RESPONSE_LENGTH.value == self.buf[0]:
+        :param frame: Saleae frame with frame.type="stop"
+        :type frame: AnalyzerFrame
+        :return: AnalyzerFrame, list of AnalyzerFrame or None
+        :rtype: AnalyzerFrame | list[AnalyzerFrame] | None
+        """
+        transport_frames = []
+        mdfu_frames = []
+        if not self.address_ack:
+            if self.mdfu_layer:
+                return None
+            return _transport_frame(self.address_start,
+                                    self.address_end,
+                                    "Client busy")
+        if not self.buf:
+            # No data bytes between address and stop, nothing to decode
+            return None
+        # Check if its an I2C read or a write operation
+        # Transport layer frames are only built when the transport layer is
+        # selected, the MDFU layer only needs the decoded packets and the
+        # state machine updates
+        if self.read:
+            if _RSP_LENGTH_TYPE == self.buf[0]:
+                if not self.mdfu_layer:
                     transport_frames.append(self.create_client_frame())
-                    transport = self.response_length_decoder.decode(self.buf, self.time)
+                    transport = self.response_length_decoder.decode(self.buf,
+                                            self.time_start, self.time_end)
                     transport_frames.extend(transport)
-                    self.state = "Response"
-                elif FrameType.RESPONSE.value == self.buf[0]:
+                self.state = "Response"
+            elif _RSP_TYPE == self.buf[0]:
+                if not self.mdfu_layer:
                     transport_frames.append(self.create_client_frame())
-                    transport, mdfu = self.response_decoder.decode(self.buf,
-                                                self.time,
-                                                command=self.command_decoder.command,
-                                                debug=self.debug)
+                transport, mdfu = self.response_decoder.decode(self.buf,
+                                            self.time_start,
+                                            self.time_end,
+                                            command=self.command_decoder.command,
+                                            debug=self.debug)
+                if not self.mdfu_layer:
                     transport_frames.extend(transport)
-                    if mdfu is not None:
-                        mdfu_frames.extend(mdfu)
-                    self.state = "Command"
-                else:
-                    # If its neither a response or response length frame the client is busy
-                    label_text = "Response not ready"
-                    transport_frames.append(AnalyzerFrame('mdfu_transport',
-                                                self.time[0]["start"],
-                                                self.time[-1]["end"],
-                                                {'type': label_text}))
-            else:
+                if mdfu is not None:
+                    mdfu_frames.extend(mdfu)
+                self.state = "Command"
+            elif not self.mdfu_layer:
+                # If its neither a response or response length frame the client is busy
+                label_text = "Response not ready"
+                transport_frames.append(_transport_frame(self.time_start[0],
+                                            self.time_end[-1],
+                                            label_text))
+        else:
+            if not self.mdfu_layer:
                 transport_frames.append(self.create_client_frame())
-                transport, mdfu = self.command_decoder.decode(self.buf, self.time)
+            transport, mdfu = self.command_decoder.decode(self.buf, self.time_start, self.time_end)
+            if not self.mdfu_layer:
                 transport_frames.extend(transport)
-                mdfu_frames.extend(mdfu)
-                self.state = "Response Length"
-            if self.protocol_layer == "mdfu":
-                return mdfu_frames
-            return transport_frames
-
-        if "address" == frame.type:
-            self.address = frame.data["address"][0] # 7 bit-address
-            self.read = frame.data["read"]
-            self.address_ack = frame.data["ack"]
-            self.address_start = frame.start_time
-            self.address_end = frame.end_time
-
-        if "start" == frame.type:
-            self.reset_buffers()
-            return None
+            mdfu_frames.extend(mdfu)
+            self.state = "Response Length"
+        if self.mdfu_layer:
+            return mdfu_frames
+        return transport_frames
 
-        if "data" == frame.type:
-            self.store_data(frame)
-            return None
+    def _on_address(self, frame: AnalyzerFrame):
+        """Store I2C address phase information
 
-        return None
+        :param frame: Saleae frame with frame.type="address"
+        :type frame: AnalyzerFrame
+        """
+        self.address = frame.data["address"][0] # 7 bit-address
+        self.read = frame.data["read"]
+        self.address_ack = frame.data["ack"]
+        self.address_start = frame.start_time
+        self.address_end = frame.end_time
+
+    def _on_start(self, frame: AnalyzerFrame): #pylint: disable=unused-argument
+        """Reset buffers on I2C start condition
+
+        :param frame: Saleae frame with frame.type="start"
+        :type frame: AnalyzerFrame
+        """
+        self.reset_buffers()
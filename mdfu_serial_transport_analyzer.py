@@ -14,6 +14,7 @@
 """
 Saleae high level analyzer for MDFU serial transport
 """
+import struct
 from abc import ABC, abstractmethod
 from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame, ChoicesSetting #pylint: disable=import-error
 from mdfu import MdfuCmdPacket, MdfuStatusPacket, MdfuStatusInvalidError, MdfuCmdNotSupportedError,\
@@ -26,6 +27,18 @@ FRAME_START_ESC_SEQ = bytes([ESCAPE_SEQ_CODE, ~FRAME_START_CODE & 0xff])
 FRAME_END_ESC_SEQ = bytes([ESCAPE_SEQ_CODE, ~FRAME_END_CODE & 0xff])
 ESCAPE_SEQ_ESC_SEQ = bytes([ESCAPE_SEQ_CODE, ~ESCAPE_SEQ_CODE & 0xff])
 
+_U16LE = struct.Struct("<H")
+
+_FRAME_START_BYTE = bytes([FRAME_START_CODE])
+_FRAME_END_BYTE = bytes([FRAME_END_CODE])
+_ESCAPE_BYTE = bytes([ESCAPE_SEQ_CODE])
+# Maps the byte following an escape code to the original (unescaped) byte
+_ESCAPED_CODES = {
+    ~FRAME_START_CODE & 0xff: FRAME_START_CODE,
+    ~FRAME_END_CODE & 0xff: FRAME_END_CODE,
+    ~ESCAPE_SEQ_CODE & 0xff: ESCAPE_SEQ_CODE,
+}
+
 class Frame():
     """UART transport frame
     
@@ -45,16 +58,17 @@ class Frame():
         """Calculate checksum for transport frame
 
         The checksum is a two's complement addition (integer addition)
-        of 16-bit values in little-endian byte oder.
+        of 16-bit values in little-endian byte oder. Data with an odd
+        number of bytes is treated as if it were zero-padded to an even
+        length.
 
         :param data: Input data for checksum calculation
         :type data: Bytes like object
         :return: 16bit checksum
         :rtype: int
         """
-        checksum = 0
-        for i in range(0, len(data), 2):
-            checksum += (data[i + 1] << 8) | data[i]
+        checksum = data[-1] if len(data) % 2 else 0
+        checksum += sum(struct.unpack_from(f"<{len(data) // 2}H", data))
         return (~checksum) & 0xffff
 
     @staticmethod
@@ -69,25 +83,31 @@ class Frame():
         :return: Decoded payload
         :rtype: bytearray
         """
-        decoded_data = bytearray()
-        escape_code = False
-        for byte in data:
-            if not escape_code:
-                if byte == ESCAPE_SEQ_CODE:
-                    escape_code = True
-                else:
-                    decoded_data.append(byte)
+        # Most frames contain no escape codes at all; memchr-scan once and
+        # hand back a plain copy in that case.
+        if ESCAPE_SEQ_CODE not in data:
+            return bytearray(data)
+        parts = bytes(data).split(_ESCAPE_BYTE)
+        decoded_data = bytearray(parts[0])
+        last = len(parts) - 1
+        for index in range(1, len(parts)):
+            part = parts[index]
+            if not part:
+                # A trailing escape code without its counterpart is dropped,
+                # like the previous byte-wise loop did. In the middle of the
+                # payload it means the escape code was followed by another
+                # escape code, which is not a valid sequence.
+                if index == last:
+                    break
+                code = ESCAPE_SEQ_CODE
             else:
-                if byte == (~FRAME_START_CODE & 0xFF):
-                    decoded_data.append(FRAME_START_CODE)
-                elif byte == (~FRAME_END_CODE & 0xFF):
-                    decoded_data.append(FRAME_END_CODE)
-                elif byte == (~ESCAPE_SEQ_CODE & 0xFF):
-                    decoded_data.append(ESCAPE_SEQ_CODE)
-                else:
-                    raise ValueError(f"Decoding of escape sequence failed: "
-                            f"Got unkown escape sequence 0x{ESCAPE_SEQ_CODE:02x}{byte:02x}")
-                escape_code = False
+                code = part[0]
+            original = _ESCAPED_CODES.get(code)
+            if original is None:
+                raise ValueError(f"Decoding of escape sequence failed: "
+                        f"Got unkown escape sequence 0x{ESCAPE_SEQ_CODE:02x}{code:02x}")
+            decoded_data.append(original)
+            decoded_data += part[1:]
         return decoded_data
 
     @staticmethod
@@ -101,17 +121,12 @@ class Frame():
         :return: Encoded frame payload
         :rtype: bytearray
         """
-        encoded_data = bytearray()
-        for byte in data:
-            if byte == FRAME_START_CODE:
-                encoded_data += FRAME_START_ESC_SEQ
-            elif byte == FRAME_END_CODE:
-                encoded_data += FRAME_END_ESC_SEQ
-            elif byte == ESCAPE_SEQ_CODE:
-                encoded_data += ESCAPE_SEQ_ESC_SEQ
-            else:
-                encoded_data.append(byte)
-        return encoded_data
+        # Escape the escape code first so the escape sequences inserted for
+        # the frame start/end codes are not escaped again.
+        encoded_data = bytes(data).replace(_ESCAPE_BYTE, ESCAPE_SEQ_ESC_SEQ)
+        encoded_data = encoded_data.replace(_FRAME_START_BYTE, FRAME_START_ESC_SEQ)
+        encoded_data = encoded_data.replace(_FRAME_END_BYTE, FRAME_END_ESC_SEQ)
+        return bytearray(encoded_data)
 
     def to_bytes(self):
         """Convert frame into bytes
@@ -119,8 +134,7 @@ class Frame():
         :return: Bytes representation of the frame
         :rtype: bytes
         """
-        padded_packet = self.packet + bytes(1) if len(self.packet) % 2 else self.packet
-        check_sequence = self.calculate_checksum(padded_packet).to_bytes(2, byteorder="little")
+        check_sequence = self.calculate_checksum(self.packet).to_bytes(2, byteorder="little")
         frame_payload = self.encode_payload(self.packet + check_sequence)
         frame = bytes([FRAME_START_CODE]) + frame_payload + bytes([FRAME_END_CODE])
         return frame
@@ -141,10 +155,11 @@ class Frame():
         if end_code != FRAME_END_CODE:
             raise ValueError(f"Invalid frame end code: {hex(end_code)}")
         payload = cls.decode_payload(frame[1:-1])
-        check_sequence = payload[-2:]
+        if len(payload) < 2:
+            raise ValueError("Frame check sequence error")
+        check_sequence = _U16LE.unpack_from(payload, len(payload) - 2)[0]
         data = payload[0:-2]
-        padded_payload = data + bytes(1) if len(data) % 2 else data
-        if cls.calculate_checksum(padded_payload + check_sequence):
+        if cls.calculate_checksum(data) != check_sequence:
             raise ValueError("Frame check sequence error")
         return cls(data)
 
@@ -14,6 +14,7 @@
 """
 Saleae high level analyzer for MDFU SPI transport
 """
+import struct
 from saleae.analyzers import HighLevelAnalyzer, AnalyzerFrame, ChoicesSetting #pylint: disable=import-error
 from mdfu import MdfuCmdPacket, MdfuStatusPacket, MdfuProtocolError, verify_checksum, MdfuCmd, MdfuStatus,\
     ClientInfo, MdfuClientInfoError
@@ -33,6 +34,54 @@ class DecodingError(Exception):
     """Exception for errors during protocol decoding
     """
 
+# Transport frame labels shared across decoders
+_LBL_CRC_VALID = "CRC (Valid)"
+_LBL_CRC_INVALID = "CRC (Invalid)"
+_LBL_DUMMY_BYTE = "DUMMY BYTE"
+_LBL_DUMMY_BYTES = "DUMMY BYTES"
+
+_U16LE = struct.Struct("<H")
+
+def _u16le(data, index):
+    """Read a 16-bit little-endian value from a buffer
+
+    :param data: Buffer to read from
+    :type data: bytes, bytearray
+    :param index: Offset of the least significant byte
+    :type index: int
+    :return: 16-bit value
+    :rtype: int
+    """
+    return _U16LE.unpack_from(data, index)[0]
+
+def _transport_frame(start_time, end_time, label):
+    """Build a transport layer analyzer frame with the given label
+
+    :param start_time: Frame start time
+    :type start_time: datetime
+    :param end_time: Frame end time
+    :type end_time: datetime
+    :param label: Frame label
+    :type label: str
+    :return: Saleae analyzer frame
+    :rtype: AnalyzerFrame
+    """
+    return AnalyzerFrame('mdfu_transport', start_time, end_time, {'type': label})
+
+def _error_frame(start_time, end_time, error):
+    """Build an error analyzer frame with the given error text
+
+    :param start_time: Frame start time
+    :type start_time: datetime
+    :param end_time: Frame end time
+    :type end_time: datetime
+    :param error: Error text
+    :type error: str
+    :return: Saleae analyzer frame
+    :rtype: AnalyzerFrame
+    """
+    return AnalyzerFrame('mdfu_error', start_time, end_time, {'error': error})
+
 class Decoder():
     """Common SPI transport decoder class"""
     WRITE = 0x11
@@ -47,34 +96,52 @@ class Decoder():
         if trace not in ("miso", "mosi"):
             raise ValueError(f"{trace} is not a valid setting. Allowed values are miso and mosi")
         self.trace = trace
+        # The trace direction is fixed for the lifetime of the decoder so
+        # the dispatch is bound once here instead of branching in decode
+        self.decode = self._decode_mosi if trace == "mosi" else self._decode_miso
 
-    def decode(self, tx, rx, time):
-        """Decode MOSI/MOSI transaction data based on trace settings
+    def _decode_mosi(self, tx, rx, time_start, time_end): #pylint: disable=unused-argument
+        """Decode MOSI transaction data
 
         :param tx: Buffer containing MOSI bytes
         :type tx: bytes, bytearray
         :param rx: Buffer containing MISO bytes
         :type rx: bytes, bytearray
-        :param time: Timestamps for MOSI/MOSI bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MOSI/MISO bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MOSI/MISO bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
-        if self.trace == "mosi":
-            return self.decode_tx(tx, time)
-        if self.trace == "miso":
-            return self.decode_rx(rx, time)
-        return []
+        return self.decode_tx(tx, time_start, time_end)
+
+    def _decode_miso(self, tx, rx, time_start, time_end): #pylint: disable=unused-argument
+        """Decode MISO transaction data
 
-    def decode_tx(self, tx, time):
+        :param tx: Buffer containing MOSI bytes
+        :type tx: bytes, bytearray
+        :param rx: Buffer containing MISO bytes
+        :type rx: bytes, bytearray
+        :param time_start: Start timestamps for MOSI/MISO bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MOSI/MISO bytes
+        :type time_end: list[datetime]
+        :raises DecodingError: When encountering a decoding error
+        :return: List of Saleae analyzer frames containing decoded data
+        :rtype: list[AnalyzerFrame]
+        """
+        return self.decode_rx(rx, time_start, time_end)
+
+    def decode_tx(self, tx, time_start, time_end):
         """Override in subclass to decode MOSI transaction data.
 
         :raises NotImplementedError: Always — subclasses must implement this method.
         """
         raise NotImplementedError("Subclasses must implement decode_tx")
 
-    def decode_rx(self, rx, time):
+    def decode_rx(self, rx, time_start, time_end):
         """Override in subclass to decode MISO transaction data.
 
         :raises NotImplementedError: Always — subclasses must implement this method.
@@ -94,72 +161,66 @@ class ResponseDecoder(Decoder):
     RSP_FRAME_RSP_DATA_END = -3
     RSP_FRAME_CRC_START = -2
     RSP_FRAME_CRC_END = -1
-    RSP_FRAME_PREFIX = bytes("RSP", encoding="ascii")
+    RSP_FRAME_PREFIX = b"RSP"
 
-    def decode_tx(self, tx, time):
+    def decode_tx(self, tx, time_start, time_end):
         """Decode MOSI transaction data
 
         :param tx: Buffer containing MOSI bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MOSI bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MOSI bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MOSI bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
         if tx[self.FRAME_READ_PREFIX_START] != self.READ:
-            raise DecodingError(f"Expected READ ({hex(self.READ)}) byte at start of frame " +
-                                "but got {tx[self.FRAME_READ_PREFIX_START]}")
-        label_text = "READ"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_READ_PREFIX_START]["start"],
-                                           time[self.FRAME_READ_PREFIX_START]["end"],
-                                           {'type': label_text}))
-
-        label_text = "DUMMY BYTES"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_DUMMY_BYTES_START]["start"],
-                                           time[self.FRAME_DUMMY_BYTES_END]["end"],
-                                           {'type': label_text}))
+            raise DecodingError(f"Expected READ ({hex(self.READ)}) byte at start of frame "
+                                f"but got {tx[self.FRAME_READ_PREFIX_START]}")
+        return_frames.append(_transport_frame(time_start[self.FRAME_READ_PREFIX_START],
+                                           time_end[self.FRAME_READ_PREFIX_START],
+                                           "READ"))
+
+        return_frames.append(_transport_frame(time_start[self.FRAME_DUMMY_BYTES_START],
+                                           time_end[self.FRAME_DUMMY_BYTES_END],
+                                           _LBL_DUMMY_BYTES))
         return return_frames
 
-    def decode_rx(self, rx, time):
+    def decode_rx(self, rx, time_start, time_end):
         """Decode MISO transaction data
 
         :param tx: Buffer containing MISO bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MISO bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MISO bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MISO bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
-        response_frame_prefix = rx[self.RSP_FRAME_PREFIX_START: self.RSP_FRAME_PREFIX_END + 1]
-        if response_frame_prefix != self.RSP_FRAME_PREFIX:
-            label_text = "DUMMY BYTE"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["start"],
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["end"],
-                                               {'type': label_text}))
-            label_text = f"Transport error: Invalid response frame prefix {response_frame_prefix}" +\
-                        f" expected {self.RSP_FRAME_PREFIX}"
+        if not rx.startswith(self.RSP_FRAME_PREFIX, self.RSP_FRAME_PREFIX_START):
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               time_end[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               _LBL_DUMMY_BYTE))
+            response_frame_prefix = rx[self.RSP_FRAME_PREFIX_START: self.RSP_FRAME_PREFIX_END + 1]
+            label_text = (f"Transport error: Invalid response frame prefix {response_frame_prefix}"
+                          f" expected {self.RSP_FRAME_PREFIX}")
             return_frames.append(AnalyzerFrame('mdfu_error',
-                                               time[self.RSP_FRAME_PREFIX_START]["start"],
-                                               time[self.RSP_FRAME_CRC_END]["end"],
+                                               time_start[self.RSP_FRAME_PREFIX_START],
+                                               time_end[self.RSP_FRAME_CRC_END],
                                                {'type': label_text}))
         else:
-            label_text = "DUMMY BYTE"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["start"],
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["end"],
-                                               {'type': label_text}))
-            label_text = "PREFIX (RSP)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_PREFIX_START]["start"],
-                                               time[self.RSP_FRAME_PREFIX_END]["end"],
-                                               {'type': label_text}))
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               time_end[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               _LBL_DUMMY_BYTE))
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_PREFIX_START],
+                                               time_end[self.RSP_FRAME_PREFIX_END],
+                                               "PREFIX (RSP)"))
 
             mdfu_packet_bin = rx[self.RSP_FRAME_RSP_DATA_START:self.RSP_FRAME_RSP_DATA_END + 1]
             try:
@@ -169,27 +230,24 @@ class ResponseDecoder(Decoder):
                     client_info = ClientInfo.from_bytes(mdfu_packet.data)
                     print(client_info)
                 return_frames.append(AnalyzerFrame('mdfu_prot_response',
-                                    time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                                    time[self.RSP_FRAME_RSP_DATA_END]["end"],
+                                    time_start[self.RSP_FRAME_RSP_DATA_START],
+                                    time_end[self.RSP_FRAME_RSP_DATA_END],
                                     {'sequence_number': str(mdfu_packet.sequence_number),
                                      'resend': mdfu_packet.resend,
                                      'status': MdfuStatus(mdfu_packet.status).name,
                                      'data': mdfu_packet.data}))
             except MdfuProtocolError as exc:
-                label_text = f"Protocol error: {exc}"
-                return_frames.append(AnalyzerFrame('mdfu_error',
-                                                time[self.RSP_FRAME_RSP_DATA_START]["start"],
-                                                time[self.RSP_FRAME_RSP_DATA_END]["end"],
-                                                {'error': label_text}))
-
-            if verify_checksum(mdfu_packet_bin, int.from_bytes(rx[self.RSP_FRAME_CRC_START:], byteorder="little")):
-                label_text = "CRC (Valid)"
+                return_frames.append(_error_frame(time_start[self.RSP_FRAME_RSP_DATA_START],
+                                                time_end[self.RSP_FRAME_RSP_DATA_END],
+                                                f"Protocol error: {exc}"))
+
+            if verify_checksum(mdfu_packet_bin, _u16le(rx, len(rx) - 2)):
+                label_text = _LBL_CRC_VALID
             else:
-                label_text = "CRC (Invalid)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                                time[self.RSP_FRAME_CRC_START]["start"],
-                                                time[self.RSP_FRAME_CRC_END]["end"],
-                                                {'type': label_text}))
+                label_text = _LBL_CRC_INVALID
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_CRC_START],
+                                                time_end[self.RSP_FRAME_CRC_END],
+                                                label_text))
 
         return return_frames
 
@@ -208,94 +266,81 @@ class ResponseStatusDecoder(Decoder):
     RSP_FRAME_CRC_END = 7
 
     FRAME_SIZE = 8
-    RSP_FRAME_PREFIX = bytes("LEN", encoding="ascii")
+    RSP_FRAME_PREFIX = b"LEN"
 
-    def decode_tx(self, tx, time):
+    def decode_tx(self, tx, time_start, time_end):
         """Decode MOSI transaction data
 
         :param tx: Buffer containing MOSI bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MOSI bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MOSI bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MOSI bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
         if tx[self.FRAME_READ_PREFIX_START] != self.READ:
-            raise DecodingError(f"Expected READ ({hex(self.READ)}) byte at start of frame " +
-                                "but got {tx[self.FRAME_READ_PREFIX_START]}")
+            raise DecodingError(f"Expected READ ({hex(self.READ)}) byte at start of frame "
+                                f"but got {tx[self.FRAME_READ_PREFIX_START]}")
         if len(tx) > self.FRAME_SIZE:
             raise DecodingError(f"Response status frame size should be {self.FRAME_SIZE} bytes but got {len(tx)}")
-        label_text = "READ"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_READ_PREFIX_START]["start"],
-                                           time[self.FRAME_READ_PREFIX_START]["end"],
-                                           {'type': label_text}))
-
-        label_text = "DUMMY BYTES"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_DUMMY_BYTES_START]["start"],
-                                           time[self.FRAME_DUMMY_BYTES_END]["end"],
-                                           {'type': label_text}))
+        return_frames.append(_transport_frame(time_start[self.FRAME_READ_PREFIX_START],
+                                           time_end[self.FRAME_READ_PREFIX_START],
+                                           "READ"))
+
+        return_frames.append(_transport_frame(time_start[self.FRAME_DUMMY_BYTES_START],
+                                           time_end[self.FRAME_DUMMY_BYTES_END],
+                                           _LBL_DUMMY_BYTES))
         return return_frames
 
-    def decode_rx(self, rx, time):
+    def decode_rx(self, rx, time_start, time_end):
         """Decode MISO transaction data
 
         :param tx: Buffer containing MISO bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MISO bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MISO bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MISO bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
-        if rx[self.RSP_FRAME_PREFIX_START: self.RSP_FRAME_PREFIX_END + 1] != self.RSP_FRAME_PREFIX:
-            label_text = "DUMMY BYTE"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["start"],
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["end"],
-                                               {'type': label_text}))
-            label_text = "PREFIX (invalid)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_PREFIX_START]["start"],
-                                               time[self.RSP_FRAME_PREFIX_END]["end"],
-                                               {'type': label_text}))
-            label_text = "Invalid data"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_RSP_LENGTH_START]["start"],
-                                               time[self.RSP_FRAME_CRC_END]["end"],
-                                               {'type': label_text}))
+        if not rx.startswith(self.RSP_FRAME_PREFIX, self.RSP_FRAME_PREFIX_START):
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               time_end[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               _LBL_DUMMY_BYTE))
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_PREFIX_START],
+                                               time_end[self.RSP_FRAME_PREFIX_END],
+                                               "PREFIX (invalid)"))
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_RSP_LENGTH_START],
+                                               time_end[self.RSP_FRAME_CRC_END],
+                                               "Invalid data"))
         else:
-            label_text = "DUMMY BYTE"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["start"],
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["end"],
-                                               {'type': label_text}))
-            label_text = "PREFIX (LEN)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_PREFIX_START]["start"],
-                                               time[self.RSP_FRAME_PREFIX_END]["end"],
-                                               {'type': label_text}))
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               time_end[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               _LBL_DUMMY_BYTE))
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_PREFIX_START],
+                                               time_end[self.RSP_FRAME_PREFIX_END],
+                                               "PREFIX (LEN)"))
 
             rsp_length_bin = rx[self.RSP_FRAME_RSP_LENGTH_START:self.RSP_FRAME_RSP_LENGTH_END + 1]
-            rsp_length = int.from_bytes(rsp_length_bin, byteorder="little")
-            label_text = f"RESPONSE LENGTH: ({rsp_length} bytes)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_RSP_LENGTH_START]["start"],
-                                               time[self.RSP_FRAME_RSP_LENGTH_END]["end"],
-                                               {'type': label_text}))
+            rsp_length = _u16le(rx, self.RSP_FRAME_RSP_LENGTH_START)
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_RSP_LENGTH_START],
+                                               time_end[self.RSP_FRAME_RSP_LENGTH_END],
+                                               f"RESPONSE LENGTH: ({rsp_length} bytes)"))
 
-            if verify_checksum(rsp_length_bin, int.from_bytes(rx[self.RSP_FRAME_CRC_START:], byteorder="little")):
-                label_text = "CRC (Valid)"
+            if verify_checksum(rsp_length_bin, _u16le(rx, self.RSP_FRAME_CRC_START)):
+                label_text = _LBL_CRC_VALID
             else:
-                label_text = "CRC (Invalid)"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_CRC_START]["start"],
-                                               time[self.RSP_FRAME_CRC_END]["end"],
-                                               {'type': label_text}))
+                label_text = _LBL_CRC_INVALID
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_CRC_START],
+                                               time_end[self.RSP_FRAME_CRC_END],
+                                               label_text))
 
         return return_frames
 
@@ -314,47 +359,47 @@ class CmdDecoder(Decoder):
     RSP_FRAME_DUMMY_BYTES_START = 0
     RSP_FRAME_DUMMY_BYTES_END = -1
 
-    def decode_rx(self, rx, time):#pylint: disable=unused-argument
+    def decode_rx(self, rx, time_start, time_end):#pylint: disable=unused-argument
         """Decode MISO transaction data
 
         :param tx: Buffer containing MISO bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MISO bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MISO bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MISO bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
 
-        label_text = "DUMMY BYTES"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.RSP_FRAME_DUMMY_BYTES_START]["start"],
-                                           time[self.RSP_FRAME_DUMMY_BYTES_END]["end"],
-                                           {'type': label_text}))
+        return_frames.append(_transport_frame(time_start[self.RSP_FRAME_DUMMY_BYTES_START],
+                                           time_end[self.RSP_FRAME_DUMMY_BYTES_END],
+                                           _LBL_DUMMY_BYTES))
         return return_frames
 
-    def decode_tx(self, tx, time):
+    def decode_tx(self, tx, time_start, time_end):
         """Decode MOSI transaction data
 
         :param tx: Buffer containing MOSI bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MOSI bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MOSI bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MOSI bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
         if tx[self.FRAME_WRITE_PREFIX_START] != self.WRITE:
-            raise DecodingError(f"Expected WRITE {hex(self.WRITE)} byte at start of frame " +
-                                "but got {tx[self.FRAME_WRITE_PREFIX_START]}")
+            raise DecodingError(f"Expected WRITE {hex(self.WRITE)} byte at start of frame "
+                                f"but got {tx[self.FRAME_WRITE_PREFIX_START]}")
 
-        label_text = "WRITE"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_WRITE_PREFIX_START]["start"],
-                                           time[self.FRAME_WRITE_PREFIX_START]["end"],
-                                           {'type': label_text}))
+        return_frames.append(_transport_frame(time_start[self.FRAME_WRITE_PREFIX_START],
+                                           time_end[self.FRAME_WRITE_PREFIX_START],
+                                           "WRITE"))
 
         data_size = len(tx) - self.FRAME_WRITE_PREFIX_LEN - self.FRAME_CRC_LEN
         mdfu_packet_bin = tx[self.FRAME_PAYLOAD_START:self.FRAME_PAYLOAD_END + 1]
@@ -362,8 +407,8 @@ class CmdDecoder(Decoder):
         try:
             mdfu_packet = MdfuCmdPacket.from_binary(mdfu_packet_bin)
             return_frames.append(AnalyzerFrame('mdfu_prot_command',
-                                    time[self.FRAME_PAYLOAD_START]["start"],
-                                    time[self.FRAME_PAYLOAD_END]["end"],
+                                    time_start[self.FRAME_PAYLOAD_START],
+                                    time_end[self.FRAME_PAYLOAD_END],
                                     {
                                         'command': MdfuCmd(mdfu_packet.command).name,
                                         'sequence_number': str(mdfu_packet.sequence_number),
@@ -371,20 +416,17 @@ class CmdDecoder(Decoder):
                                         'data': mdfu_packet.data
                                     }))
         except MdfuProtocolError as exc:
-            msg = f"Protocol error: {exc}"
-            return_frames.append(AnalyzerFrame('mdfu_error',
-                        time[self.FRAME_PAYLOAD_START]["start"],
-                        time[self.FRAME_PAYLOAD_END]["end"],
-                        {'error': msg}))
+            return_frames.append(_error_frame(time_start[self.FRAME_PAYLOAD_START],
+                        time_end[self.FRAME_PAYLOAD_END],
+                        f"Protocol error: {exc}"))
 
-        if verify_checksum(mdfu_packet_bin, int.from_bytes(tx[self.FRAME_CRC_START:], byteorder="little")):
-            label_text = "CRC (Valid)"
+        if verify_checksum(mdfu_packet_bin, _u16le(tx, len(tx) - 2)):
+            label_text = _LBL_CRC_VALID
         else:
-            label_text = "CRC (Invalid)"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_CRC_START]["start"],
-                                           time[self.FRAME_CRC_END]["end"],
-                                           {'type': label_text}))
+            label_text = _LBL_CRC_INVALID
+        return_frames.append(_transport_frame(time_start[self.FRAME_CRC_START],
+                                           time_end[self.FRAME_CRC_END],
+                                           label_text))
         return return_frames
 
 class InvalidFrameDecoder(Decoder):
@@ -402,60 +444,58 @@ class InvalidFrameDecoder(Decoder):
     RSP_FRAME_CRC_END = 7
 
     FRAME_SIZE = 8
-    RSP_FRAME_PREFIX = bytes("LEN", encoding="ascii")
+    RSP_FRAME_PREFIX = b"LEN"
 
-    def decode_tx(self, tx, time):
+    def decode_tx(self, tx, time_start, time_end):
         """Decode MOSI transaction data
 
         :param tx: Buffer containing MOSI bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MOSI bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MOSI bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MOSI bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
-        label_text = "READ"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-            time[self.FRAME_PREFIX_START]["start"],
-            time[self.FRAME_PREFIX_START]["end"],
-            {'type': label_text}))
-
-        label_text = "DUMMY BYTES"
-        return_frames.append(AnalyzerFrame('mdfu_transport',
-                                           time[self.FRAME_DUMMY_BYTES_START]["start"],
-                                           time[-1]["end"],
-                                           {'type': label_text}))
+        return_frames.append(_transport_frame(time_start[self.FRAME_PREFIX_START],
+            time_end[self.FRAME_PREFIX_START],
+            "READ"))
+
+        return_frames.append(_transport_frame(time_start[self.FRAME_DUMMY_BYTES_START],
+                                           time_end[-1],
+                                           _LBL_DUMMY_BYTES))
         return return_frames
 
-    def decode_rx(self, rx, time):
+    def decode_rx(self, rx, time_start, time_end):
         """Decode MISO transaction data
 
         :param tx: Buffer containing MISO bytes
         :type tx: bytes, bytearray
-        :param time: Timestamps for MISO bytes
-        :type time: list[dict(str:datetime)]
+        :param time_start: Start timestamps for MISO bytes
+        :type time_start: list[datetime]
+        :param time_end: End timestamps for MISO bytes
+        :type time_end: list[datetime]
         :raises DecodingError: When encountering a decoding error
         :return: List of Saleae analyzer frames containing decoded data
         :rtype: list[AnalyzerFrame]
         """
         return_frames = []
-        if rx[self.RSP_FRAME_PREFIX_START: self.RSP_FRAME_PREFIX_END + 1] != self.RSP_FRAME_PREFIX:
-            label_text = "DUMMY BYTE"
-            return_frames.append(AnalyzerFrame('mdfu_transport',
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["start"],
-                                               time[self.RSP_FRAME_DUMMY_BYTE_START]["end"],
-                                               {'type': label_text}))
+        if not rx.startswith(self.RSP_FRAME_PREFIX, self.RSP_FRAME_PREFIX_START):
+            return_frames.append(_transport_frame(time_start[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               time_end[self.RSP_FRAME_DUMMY_BYTE_START],
+                                               _LBL_DUMMY_BYTE))
             label_text = "PREFIX (invalid)"
             return_frames.append(AnalyzerFrame('mdfu_transport_error',
-                                               time[self.RSP_FRAME_PREFIX_START]["start"],
-                                               time[self.RSP_FRAME_PREFIX_END]["end"],
+                                               time_start[self.RSP_FRAME_PREFIX_START],
+                                               time_end[self.RSP_FRAME_PREFIX_END],
                                                {'type': 'PREFIX', 'error': label_text}))
             label_text = "DATA (invalid)"
             return_frames.append(AnalyzerFrame('mdfu_transport_error',
-                                               time[self.RSP_FRAME_RSP_LENGTH_START]["start"],
-                                               time[-1]["end"],
+                                               time_start[self.RSP_FRAME_RSP_LENGTH_START],
+                                               time_end[-1],
                                                {'type': 'DATA', 'error': label_text}))
 
         return return_frames
@@ -511,9 +551,10 @@ class MdfuSpiTransportAnalyzer(HighLevelAnalyzer):
         self.response_status_decoder = ResponseStatusDecoder(trace=self.trace_setting)
         self.command_decoder = CmdDecoder(trace=self.trace_setting)
         self.invalid_frame_decoder = InvalidFrameDecoder(trace=self.trace_setting)
-        self.txbuf = bytearray()
-        self.rxbuf = bytearray()
-        self.time = []
+        self.txbuf = []
+        self.rxbuf = []
+        self.time_start = []
+        self.time_end = []
         self.state = "cmd"
 
     def reset_buffers(self):
@@ -522,7 +563,8 @@ class MdfuSpiTransportAnalyzer(HighLevelAnalyzer):
         """
         self.txbuf.clear()
         self.rxbuf.clear()
-        self.time = []
+        self.time_start.clear()
+        self.time_end.clear()
 
     def store_data(self, frame: AnalyzerFrame):
         """Store SPI data in buffer
@@ -533,9 +575,10 @@ class MdfuSpiTransportAnalyzer(HighLevelAnalyzer):
         :param frame: Saleae frame that has result type (frame.type="result")
         :type frame: AnalyzerFrame
         """
-        self.time.append({"start": frame.start_time, "end": frame.end_time})
-        self.rxbuf.extend(frame.data["miso"])
-        self.txbuf.extend(frame.data["mosi"])
+        self.time_start.append(frame.start_time)
+        self.time_end.append(frame.end_time)
+        self.rxbuf.append(frame.data["miso"])
+        self.txbuf.append(frame.data["mosi"])
 
     def decode(self, frame: AnalyzerFrame):
         """Decode SPI traffic"""
@@ -543,33 +586,38 @@ class MdfuSpiTransportAnalyzer(HighLevelAnalyzer):
         if frame.type == "disable":
             self.spi_cs = False
             return_frames = None
+            # Materialize the buffered MOSI/MISO chunks once per transaction
+            txbuf = b"".join(self.txbuf)
+            rxbuf = b"".join(self.rxbuf)
             try:
-                if self.WRITE == self.txbuf[0]:
+                if self.WRITE == txbuf[0]:
                     debug_print("Decoding command")
                     self.state = "len"
-                    return self.command_decoder.decode(self.txbuf, self.rxbuf, self.time)
+                    return self.command_decoder.decode(txbuf, rxbuf, self.time_start, self.time_end)
 
-                elif self.READ == self.txbuf[0]:
-                    prefix = self.rxbuf[1:4]
-                    if ResponseDecoder.RSP_FRAME_PREFIX == prefix:
+                elif self.READ == txbuf[0]:
+                    if rxbuf.startswith(ResponseDecoder.RSP_FRAME_PREFIX, 1):
                         debug_print("Decoding response")
                         self.state = "cmd"
-                        return_frames = self.response_decoder.decode(self.txbuf, self.rxbuf, self.time)
-                    elif ResponseStatusDecoder.RSP_FRAME_PREFIX == prefix:
+                        return_frames = self.response_decoder.decode(txbuf, rxbuf, self.time_start, self.time_end)
+                    elif rxbuf.startswith(ResponseStatusDecoder.RSP_FRAME_PREFIX, 1):
                         debug_print("Decoding response status")
                         self.state ="rsp"
-                        return_frames = self.response_status_decoder.decode(self.txbuf, self.rxbuf, self.time)
+                        return_frames = self.response_status_decoder.decode(txbuf, rxbuf,
+                                                                            self.time_start, self.time_end)
                     else:
                         # Unless we are in the poll for the response length
                         # we must consider this case as an error
                         if self.state != "len":
-                            return_frames = self.invalid_frame_decoder.decode(self.txbuf, self.rxbuf, self.time)
+                            return_frames = self.invalid_frame_decoder.decode(txbuf, rxbuf,
+                                                                              self.time_start, self.time_end)
                         else:
-                            return_frames = self.response_status_decoder.decode(self.txbuf, self.rxbuf, self.time)
+                            return_frames = self.response_status_decoder.decode(txbuf, rxbuf,
+                                                                                self.time_start, self.time_end)
 
             except DecodingError as exc:
                 # Let's skip this frame, print the error and try the next one
-                print(f"Error decoding frame: {exc}")
+                debug_print(f"Error decoding frame: {exc}")
 
             return return_frames
 